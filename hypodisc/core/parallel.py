@@ -1,13 +1,13 @@
 #! /usr/bin/env python
 
 import concurrent.futures as cf
-from multiprocessing import Manager, Lock
-from multiprocessing.managers import ListProxy
-from random import random
-from typing import Counter, Literal, Optional
+from itertools import repeat
+from multiprocessing import cpu_count
+from random import getrandbits
+from typing import Literal, Optional
 
 import numpy as np
-from hypodisc.data.utils import write_query
+from hypodisc.data.utils import write_queries
 
 from rdf.formats import NTriples
 from rdf.namespaces import RDF, RDFS
@@ -17,12 +17,13 @@ from hypodisc.data.graph import KnowledgeGraph
 from hypodisc.core.sequential import (explore, infer_type, new_graph_pattern,
                                       new_var_graph_pattern,
                                       new_mm_graph_pattern)
-from hypodisc.core.structures import (GraphPattern,
+from hypodisc.core.structures import (Assertion,
+                                      GraphPattern,
                                       DataTypeVariable,
                                       MultiModalNumericVariable,
                                       MultiModalStringVariable,
                                       ObjectTypeVariable)
-from hypodisc.core.utils import predict_hash
+from hypodisc.core.utils import filter_visited, predict_hash
 from hypodisc.multimodal.clustering import (compute_clusters,
                                             SUPPORTED_XSD_TYPES)
 from hypodisc.multimodal.datatypes import (XSD_DATEFRAG, XSD_DATETIME,
@@ -32,14 +33,33 @@ from hypodisc.multimodal.datatypes import (XSD_DATEFRAG, XSD_DATETIME,
 XSD_TEMPORAL = set.union(XSD_DATETIME, XSD_DATEFRAG)
 IGNORE_PREDICATES = {RDF + 'type', RDFS + 'label'}
 
-def init_lock(plock:Lock) -> None:
-    """
-    Initiate a global variable lock
+# read-only state shared with the workers, set once per worker process
+_kg = None  # type: Optional[KnowledgeGraph]
+_kg_values = None  # type: Optional[np.ndarray]
+_root_assertions = dict()  # type: dict[str, list[Assertion]]
+
 
-    :param plock:
+def init_worker(kg: Optional[KnowledgeGraph],
+                root_assertions: Optional[dict[str, list[Assertion]]])\
+        -> None:
+    """ Initiate the global variables of a worker, such that large
+        read-only structures are transferred once per worker rather
+        than once per task.
+
+    :param kg:
+    :type kg: Optional[KnowledgeGraph]
+    :param root_assertions:
+    :type root_assertions: Optional[dict[str, list[Assertion]]]
+    :rtype: None
     """
-    global lock
-    lock = plock
+    global _kg, _kg_values, _root_assertions
+    if kg is not None:
+        _kg = kg
+
+        # raw values of all nodes, to allow vectorized lookups
+        _kg_values = np.array([node.value for node in kg.i2n], dtype=object)
+    if root_assertions is not None:
+        _root_assertions = root_assertions
 
 
 def generate(root_patterns: dict[str, list],
@@ -67,31 +87,58 @@ def generate(root_patterns: dict[str, list],
     :type max_width: int
     """
 
-    if strategy == "BFS":
-        return generate_bf(root_patterns=root_patterns,
-                           depths=depths,
-                           min_support=min_support,
-                           p_explore=p_explore,
-                           p_extend=p_extend,
-                           max_length=max_length,
-                           max_width=max_width,
-                           out_writer=out_writer,
-                           out_prefix_map=out_prefix_map,
-                           out_ns=out_ns)
-    else:  # DFS
-        return generate_df(root_patterns=root_patterns,
-                           depths=depths,
-                           min_support=min_support,
-                           p_explore=p_explore,
-                           p_extend=p_extend,
-                           max_length=max_length,
-                           max_width=max_width,
-                           out_writer=out_writer,
-                           out_prefix_map=out_prefix_map,
-                           out_ns=out_ns)
-
-
-def generate_df(root_patterns: dict[str, list],
+    # the workers only need the assertions of the root patterns to
+    # extend from, which are much smaller to transfer; these are sorted
+    # such that each is paired with the same random draw on every run
+    root_assertions = {name: [pattern.assertion for pattern
+                              in sorted(patterns,
+                                        key=lambda p: (p.canonical_hash(),
+                                                       sorted(p.domain)))]
+                       for name, patterns in root_patterns.items()}
+
+    # base seed of the random number generators of all tasks
+    seed = getrandbits(64)
+
+    # a single pool of workers is kept alive for the entire search to
+    # avoid spawning new processes for each depth and type, whereas a
+    # single thread serializes the output while the workers continue
+    with cf.ProcessPoolExecutor(initializer=init_worker,
+                                initargs=(None, root_assertions))\
+            as executor,\
+            cf.ThreadPoolExecutor(max_workers=1) as writer:
+        if strategy == "BFS":
+            return generate_bf(executor=executor,
+                               writer=writer,
+                               seed=seed,
+                               root_patterns=root_patterns,
+                               depths=depths,
+                               min_support=min_support,
+                               p_explore=p_explore,
+                               p_extend=p_extend,
+                               max_length=max_length,
+                               max_width=max_width,
+                               out_writer=out_writer,
+                               out_prefix_map=out_prefix_map,
+                               out_ns=out_ns)
+        else:  # DFS
+            return generate_df(executor=executor,
+                               writer=writer,
+                               seed=seed,
+                               root_patterns=root_patterns,
+                               depths=depths,
+                               min_support=min_support,
+                               p_explore=p_explore,
+                               p_extend=p_extend,
+                               max_length=max_length,
+                               max_width=max_width,
+                               out_writer=out_writer,
+                               out_prefix_map=out_prefix_map,
+                               out_ns=out_ns)
+
+
+def generate_df(executor: cf.ProcessPoolExecutor,
+                writer: cf.ThreadPoolExecutor, seed: int,
+                root_patterns: dict[str, list],
                 depths: range, min_support: int,
                 p_explore: float, p_extend: float,
                 max_length: int, max_width: int,
@@ -99,8 +146,15 @@ def generate_df(root_patterns: dict[str, list],
                 out_prefix_map: Optional[dict[str, str]],
                 out_ns: Optional[IRIRef]) -> int:
     """ Generate all patterns up to and including a maximum depth which
-        satisfy a minimal support, using a depth first approach.
-
+        satisfy a minimal support, using a depth first approach. Unlike the
+        breadth first approach, depths are not explored in lockstep.
+
+    :param executor:
+    :type executor: cf.ProcessPoolExecutor
+    :param writer:
+    :type writer: cf.ThreadPoolExecutor
+    :param seed: base seed of the random number generators
+    :type seed: int
     :param depths:
     :type depths: range
     :param min_support:
@@ -116,74 +170,71 @@ def generate_df(root_patterns: dict[str, list],
     :rtype: None
     """
 
-    patterns = set()
     num_patterns = 0
-    with Manager() as manager:
-        for name in sorted(list(root_patterns.keys())):
-            print(f"type {name}")
-
-            visited = manager.list()
-            for depth in range(0, depths.stop):
-                print(" exploring depth {} / {}".format(depth+1, depths.stop),
-                      end=" ")
-
-                if depth == 0:
-                    patterns = root_patterns[name]
-
-                derivatives = set()
-                if depth <= 0:
-                    # add these as parents for next depth
-                    for pattern in patterns:
-                        if isinstance(pattern.assertion.rhs,
-                                      ObjectTypeVariable):
-                            derivatives.add(pattern)
-
-                lock = Lock()
-                with cf.ProcessPoolExecutor(initializer=init_lock,
-                                            initargs=(lock,)) as executor:
-                    fcandidates = [executor.submit(compute_candidates,
-                                                   root_patterns, pattern,
-                                                   depth, p_explore, p_extend,
-                                                   visited)
-                                   for pattern in patterns
-                                   if len(pattern) < max_length
-                                   and pattern.width() < max_width]
-
-                    fextensions = list()
-                    for fcandidate in cf.as_completed(fcandidates):
-                        pattern, candidates = fcandidate.result()
-
-                        # start as soon as candidates drop in
-                        fextensions.append(executor.submit(explore,
-                                                           pattern, candidates,
-                                                           max_length,
-                                                           max_width,
-                                                           min_support))
-
-                    for fextension in cf.as_completed(fextensions):
-                        extensions = fextension.result()
-                        derivatives |= extensions
-
-                        if out_writer is not None\
-                                and out_prefix_map is not None:
-                            for pattern in extensions:
-                                num_patterns = write_query(out_writer, pattern,
-                                                           num_patterns,
-                                                           out_ns,
-                                                           out_prefix_map)
-
-                print("(+{} discovered)".format(len(derivatives)))
-
-                # omit exhausted classes from next iteration
-                if len(derivatives) > 0:
-                    patterns = {v for v in derivatives}
-                else:
-                    break
+    fwrites = list()
+    for name in sorted(list(root_patterns.keys())):
+        print(f"type {name}", end=" ")
+
+        # Patterns are scheduled as soon as their parent has been explored,
+        # rather than per depth, to keep all workers busy until the
+        # search space of this type is exhausted. Root patterns which end
+        # in an object type variable also act as parents on the next depth.
+        frontier = [(pattern, 0) for pattern in root_patterns[name]]
+        frontier += [(pattern, 1) for pattern in root_patterns[name]
+                     if isinstance(pattern.assertion.rhs,
+                                   ObjectTypeVariable)]
+
+        visited = set()
+        num_derivatives = 0
+        fextensions = dict()  # type: dict[cf.Future, int]
+        while len(frontier) > 0 or len(fextensions) > 0:
+            for pattern, depth in frontier:
+                if depth >= depths.stop\
+                        or len(pattern) >= max_length\
+                        or pattern.width() >= max_width:
+                    continue
+
+                fextension = executor.submit(compute_and_explore, pattern,
+                                             depth, p_explore, p_extend,
+                                             seed, max_length,
+                                             max_width, min_support)
+                fextensions[fextension] = depth
+            frontier = list()
+
+            done, _ = cf.wait(fextensions.keys(),
+                              return_when=cf.FIRST_COMPLETED)
+            for future in done:
+                depth = fextensions.pop(future)
+
+                # omit patterns already discovered from another parent
+                extensions = filter_visited(future.result(), visited)
+                num_derivatives += len(extensions)
+
+                if out_writer is not None\
+                        and out_prefix_map is not None:
+                    # the single writer thread preserves the numbering
+                    fwrites.append(writer.submit(write_queries, out_writer,
+                                                 list(extensions),
+                                                 num_patterns, out_ns,
+                                                 out_prefix_map))
+                    num_patterns += len(extensions)
+
+                # continue from the extensions on the next depth
+                frontier.extend((pattern, depth + 1)
+                                for pattern in extensions)
+
+        print("(+{} discovered)".format(num_derivatives))
+
+    # wait for pending writes and raise their errors, if any
+    for fwrite in fwrites:
+        fwrite.result()
 
     return num_patterns
 
 
-def generate_bf(root_patterns: dict[str, list],
+def generate_bf(executor: cf.ProcessPoolExecutor,
+                writer: cf.ThreadPoolExecutor, seed: int,
+                root_patterns: dict[str, list],
                 depths: range, min_support: int,
                 p_explore: float, p_extend: float,
                 max_length: int, max_width: int,
@@ -193,6 +244,12 @@ def generate_bf(root_patterns: dict[str, list],
     """ Generate all patterns up to and including a maximum depth which
         satisfy a minimal support, using a breadth first approach.
 
+    :param executor:
+    :type executor: cf.ProcessPoolExecutor
+    :param writer:
+    :type writer: cf.ThreadPoolExecutor
+    :param seed: base seed of the random number generators
+    :type seed: int
     :param depths:
     :type depths: range
     :param min_support:
@@ -208,82 +265,122 @@ def generate_bf(root_patterns: dict[str, list],
     :rtype: None
     """
 
+    parents = dict()
     num_patterns = 0
-    with Manager() as manager:
-        parents = dict()
-        for depth in range(0, depths.stop):
-            print("exploring depth {} / {}".format(depth+1, depths.stop))
-
-            if depth == 0:
-                parents = root_patterns
-
-            derivatives = dict()
-            visited = manager.list()
-            for name in sorted(list(parents.keys())):
-                print(f" type {name}", end=" ")
-
-                derivatives[name] = set()
-                patterns = parents[name]
-                if depth > 0:
-                    patterns = parents.pop(name)
-                else:
-                    # add these as parents for next depth
-                    for pattern in patterns:
-                        if isinstance(pattern.assertion.rhs,
-                                      ObjectTypeVariable):
-                            derivatives[name].add(pattern)
-
-                lock = Lock()
-                with cf.ProcessPoolExecutor(initializer=init_lock,
-                                            initargs=(lock,)) as executor:
-                    fcandidates = [executor.submit(compute_candidates,
-                                                   root_patterns, pattern,
-                                                   depth, p_explore, p_extend,
-                                                   visited)
-                                   for pattern in patterns
-                                   if len(pattern) < max_length
-                                   and pattern.width() < max_width]
-
-                    fextensions = list()
-                    for fcandidate in cf.as_completed(fcandidates):
-                        pattern, candidates = fcandidate.result()
-
-                        # start as soon as candidates drop in
-                        fextensions.append(executor.submit(explore,
-                                                           pattern, candidates,
-                                                           max_length,
-                                                           max_width,
-                                                           min_support))
-
-                    for fextension in cf.as_completed(fextensions):
-                        extensions = fextension.result()
-                        derivatives[name] |= extensions
-
-                        if out_writer is not None\
-                                and out_prefix_map is not None:
-                            for pattern in extensions:
-                                num_patterns = write_query(out_writer, pattern,
-                                                           num_patterns,
-                                                           out_ns,
-                                                           out_prefix_map)
-
-                print("(+{} discovered)".format(len(derivatives[name])))
-
-            # omit exhausted classes from next iteration
-            parents = {k: v for k, v in derivatives.items()
-                       if len(v) > 0}
+    fwrites = list()
+    for depth in range(0, depths.stop):
+        print("exploring depth {} / {}".format(depth+1, depths.stop))
+
+        if depth == 0:
+            parents = root_patterns
+
+        visited = set()
+        derivatives = dict()
+        for name in sorted(list(parents.keys())):
+            print(f" type {name}", end=" ")
+
+            derivatives[name] = set()
+            patterns = parents[name]
+            if depth > 0:
+                patterns = parents.pop(name)
+            else:
+                # add these as parents for next depth
+                for pattern in patterns:
+                    if isinstance(pattern.assertion.rhs,
+                                  ObjectTypeVariable):
+                        derivatives[name].add(pattern)
+
+            patterns = [pattern for pattern in patterns
+                        if len(pattern) < max_length
+                        and pattern.width() < max_width]
+            fextensions = executor.map(compute_and_explore, patterns,
+                                       repeat(depth), repeat(p_explore),
+                                       repeat(p_extend), repeat(seed),
+                                       repeat(max_length),
+                                       repeat(max_width),
+                                       repeat(min_support),
+                                       chunksize=chunksize(len(patterns)))
+
+            for extensions in fextensions:
+                # omit patterns already discovered from another parent
+                extensions = filter_visited(extensions, visited)
+                derivatives[name] |= extensions
+
+                if out_writer is not None\
+                        and out_prefix_map is not None:
+                    # the single writer thread preserves the numbering
+                    fwrites.append(writer.submit(write_queries, out_writer,
+                                                 list(extensions),
+                                                 num_patterns, out_ns,
+                                                 out_prefix_map))
+                    num_patterns += len(extensions)
+
+            print("(+{} discovered)".format(len(derivatives[name])))
+
+        # omit exhausted classes from next iteration
+        parents = {k: v for k, v in derivatives.items()
+                   if len(v) > 0}
+
+    # wait for pending writes and raise their errors, if any
+    for fwrite in fwrites:
+        fwrite.result()
 
     return num_patterns
 
 
-def compute_candidates(root_patterns: dict, pattern: GraphPattern, depth: int,
-                       p_explore: float, p_extend: float,
-                       visited: ListProxy)\
-                               -> tuple[GraphPattern, set]:
-    """ Compute and return all candidates for this pattern.
+def chunksize(num_tasks: int) -> int:
+    """ Return the number of tasks to send to a worker at once, such that
+        each worker receives about four batches.
+
+    :param num_tasks:
+    :type num_tasks: int
+    :rtype: int
+    """
+    return max(1, num_tasks // (4 * cpu_count()))
+
+
+def compute_and_explore(pattern: GraphPattern, depth: int,
+                        p_explore: float, p_extend: float, seed: int,
+                        max_length: int, max_width: int,
+                        min_support: int) -> set[GraphPattern]:
+    """ Compute the candidates for this pattern and explore these within
+        the same task, to avoid sending the candidates back and forth.
+        Deduplication against extensions of other patterns is left to the
+        caller.
+
+    :param pattern:
+    :type pattern: GraphPattern
+    :param depth:
+    :type depth: int
+    :param p_explore:
+    :type p_explore: float
+    :param p_extend:
+    :type p_extend: float
+    :param seed: base seed of the random number generators
+    :type seed: int
+    :param max_length:
+    :type max_length: int
+    :param max_width:
+    :type max_width: int
+    :param min_support:
+    :type min_support: int
+    :rtype: set[GraphPattern]
+    """
+    candidates = compute_candidates(pattern, depth, p_explore, p_extend,
+                                    seed)
+    if len(candidates) <= 0:
+        return set()
+
+    return explore(pattern, set(candidates.values()), max_length,
+                   max_width, min_support)
+
+
+def compute_candidates(pattern: GraphPattern, depth: int,
+                       p_explore: float, p_extend: float, seed: int)\
+                               -> dict[int, tuple]:
+    """ Compute and return all candidates for this pattern, indexed by the
+        hash of the pattern they would produce.
 
-    :param root_patterns:
-    :type root_patterns: dict
     :param pattern:
     :type pattern: GraphPattern
     :param depth:
@@ -292,10 +389,16 @@ def compute_candidates(root_patterns: dict, pattern: GraphPattern, depth: int,
     :type p_explore: float
     :param p_extend:
     :type p_extend: float
-    :param visited:
-    :type visited: ListProxy
-    :rtype: tuple[GraphPattern,set]
+    :param seed: base seed of the random number generators
+    :type seed: int
+    :rtype: dict[int,tuple]
     """
+    root_assertions = _root_assertions
+
+    # the draws only depend on the seed and on the pattern itself, and not
+    # on which worker handles it or when
+    rng = np.random.default_rng([seed, pattern.canonical_hash(), depth])
+
     if depth <= 0:
         endpoints = {pattern.root}
     else:
@@ -303,47 +406,88 @@ def compute_candidates(root_patterns: dict, pattern: GraphPattern, depth: int,
         # Only consider unbound object type variables since we
         # cannot connect to literals or data type variables, and
         # bound entities already have a fixed context.
-        endpoints = {a.rhs for a in pattern.distances[depth-1]
-                     if isinstance(a.rhs, ObjectTypeVariable)}
+        endpoints = pattern.endpoints[depth-1]
 
-    candidates = set()
-    for endpoint in endpoints:
-        if endpoint.value not in root_patterns.keys():
-            # no extension available
-            continue
+    # pair each endpoint with the same draw on every run
+    endpoints = sorted(endpoints, key=pattern.endpoint_hash)
 
-        if p_explore < random():
+    candidates = dict()
+    explore_draws = rng.random(len(endpoints))
+    for endpoint, explore_draw in zip(endpoints, explore_draws):
+        if p_explore < explore_draw:
             # skip this endpoint with probability p_explore
             continue
 
+        if endpoint.value not in root_assertions.keys():
+            # no extension available
+            continue
+
         # Gather all candidate extensions that can connect
         # to an object type variable of the relevant type.
-        for base_pattern in root_patterns[endpoint.value]:
-            if p_extend < random():
+        extensions = root_assertions[endpoint.value]
+        extend_draws = rng.random(len(extensions))
+        for extension, extend_draw in zip(extensions, extend_draws):
+            if p_extend < extend_draw:
                 # skip this extension with probability p_extend
                 continue
 
-            # get base assertion
-            extension = base_pattern.assertion
+            # prune
+            if pattern.contains_at_depth(extension, depth):
+                continue
 
             pattern_hash = predict_hash(pattern,
                                         endpoint,
                                         extension)
+            if pattern_hash in candidates.keys():
+                continue
 
-            skip = False
-            with lock:
-                if pattern_hash in visited\
-                        or pattern.contains_at_depth(extension, depth):
-                    skip = True
-                if not skip:
-                    visited.append(pattern_hash)
+            candidates[pattern_hash] = (endpoint, extension)
+
+    return candidates
+
+
+def isin_sorted(values: np.ndarray, members: np.ndarray) -> np.ndarray:
+    """ Return a mask which marks the values that occur in members. Same
+        as np.isin, but uses a binary search since members is sorted.
+
+    :param values:
+    :type values: np.ndarray
+    :param members: sorted array
+    :type members: np.ndarray
+    :rtype: np.ndarray
+    """
+    if len(members) <= 0:
+        return np.zeros(len(values), dtype=bool)
+
+    idx = np.searchsorted(members, values)
+    idx[idx >= len(members)] = 0
+
+    return members[idx] == values
 
-            if skip:
-                continue
 
-            candidates.add((endpoint, extension))
+def group_by(keys: np.ndarray, values: np.ndarray) -> dict[int, set[int]]:
+    """ Map each unique key onto the set of values it co-occurs with, in a
+        single pass over the sorted keys.
 
-    return pattern, candidates
+    :param keys:
+    :type keys: np.ndarray
+    :param values:
+    :type values: np.ndarray
+    :rtype: dict[int, set[int]]
+    """
+    if len(keys) <= 0:
+        return dict()
+
+    order = np.argsort(keys, kind='stable')
+    keys_sorted = keys[order]
+    values_sorted = values[order]
+
+    boundaries = np.flatnonzero(np.diff(keys_sorted)) + 1
+    starts = np.concatenate(([0], boundaries))
+
+    return {key: set(group.tolist()) for key, group in
+            zip(keys_sorted[starts].tolist(),
+                np.split(values_sorted, boundaries))}
 
 
 def init_root_patterns(rng: np.random.Generator, kg: KnowledgeGraph,
@@ -377,60 +521,94 @@ def init_root_patterns(rng: np.random.Generator, kg: KnowledgeGraph,
     # list of predicate indices to ingore
     exclude_idx = [kg.r2i[IRIRef(p)] for p in exclude]
 
-    class_idx_list = sorted(list(set(A_type.col)))
-    class_freq = A_type.sum(axis=0)[class_idx_list]
-    for class_i, class_idx in enumerate(class_idx_list):
-        # if the number of type instances do not exceed the minimal support
-        # then any pattern of this type will not either
-        support = class_freq[class_i]
-        if support < min_support:
-            continue
-
-        class_name = kg.i2n[class_idx]
-        root_patterns[class_name] = set()
-
-        print(f" type {class_name}...", end='')
-
-        # find all members of this class
-        class_members_idx = A_type.row[A_type.col == class_idx]
-
-        root_var = ObjectTypeVariable(class_name)
-        with cf.ProcessPoolExecutor() as executor:
-            futures = [executor.submit(compute_root_patterns, rng, kg,
-                                       min_support, mode, textual_support,
-                                       numerical_support, temporal_support,
-                                       p_idx, rdf_type_idx, root_var,
-                                       class_members_idx)
-                       for p_idx in range(kg.num_relations)
-                       if p_idx != rdf_type_idx
-                       and p_idx not in exclude_idx
-                       and len(set(kg.A[p_idx].row) &
-                               set(class_members_idx)) >= min_support]
+    # unique head nodes of all predicates, stacked, with the predicate
+    # that each belongs to; lets us compute the support of all predicates
+    # for a class at once
+    p_heads = [np.unique(kg.A[p_idx].row) for p_idx in range(kg.num_relations)]
+    heads = np.concatenate(p_heads)
+    heads_p_idx = np.repeat(np.arange(kg.num_relations),
+                            [len(p_head) for p_head in p_heads])
+
+    # head and tail nodes per predicate, looked up once
+    p_rows = [kg.A[p_idx].row for p_idx in range(kg.num_relations)]
+    p_cols = [kg.A[p_idx].col for p_idx in range(kg.num_relations)]
+
+    # narrowest integer type that fits all node indices, to halve the
+    # bytes pickled per task on most graphs
+    idx_dtype = np.int32 if kg.num_nodes <= np.iinfo(np.int32).max\
+        else np.int64
+
+    # number of type instances per class, in a single pass
+    class_freq = np.bincount(A_type.col)
+
+    # if the number of type instances do not exceed the minimal support
+    # then any pattern of this type will not either
+    class_idx_list = np.flatnonzero((class_freq > 0)
+                                    & (class_freq >= min_support))
+    with cf.ProcessPoolExecutor(initializer=init_worker,
+                                initargs=(kg, None)) as executor:
+        for class_idx in class_idx_list:
+            class_name = kg.i2n[class_idx]
+            root_patterns[class_name] = set()
+
+            print(f" type {class_name}...", end='')
+
+            # find all members of this class, sorted for faster lookups
+            class_members_idx = np.unique(A_type.row[A_type.col == class_idx])
+
+            # number of class members with each relation outgoing
+            heads_mask = isin_sorted(heads, class_members_idx)
+            p_supports = np.bincount(heads_p_idx[heads_mask],
+                                     minlength=kg.num_relations)
+
+            root_var = ObjectTypeVariable(class_name)
+            futures = list()
+            for p_idx in range(kg.num_relations):
+                if p_idx == rdf_type_idx or p_idx in exclude_idx:
+                    continue
+
+                if p_supports[p_idx] < min_support:
+                    continue
+
+                # mask for class members that have this relation outgoing
+                p_mask = isin_sorted(p_rows[p_idx], class_members_idx)
+
+                # only send the edges of the class members to the worker
+                futures.append(executor.submit(compute_root_patterns, rng,
+                                               min_support, mode,
+                                               textual_support,
+                                               numerical_support,
+                                               temporal_support,
+                                               p_idx, rdf_type_idx, root_var,
+                                               p_rows[p_idx][p_mask]
+                                               .astype(idx_dtype),
+                                               p_cols[p_idx][p_mask]
+                                               .astype(idx_dtype)))
 
             for future in cf.as_completed(futures):
                 root_patterns[class_name] |= future.result()
 
-        tree_size = len(root_patterns[class_name])
-        print(" (+{} discovered)".format(tree_size))
+            tree_size = len(root_patterns[class_name])
+            print(" (+{} discovered)".format(tree_size))
 
-        if tree_size <= 0:
-            del root_patterns[class_name]
+            if tree_size <= 0:
+                del root_patterns[class_name]
 
     return root_patterns
 
 
-def compute_root_patterns(rng: np.random.Generator, kg: KnowledgeGraph,
+def compute_root_patterns(rng: np.random.Generator,
                           min_support: float, mode: Literal["A", "AT", "T"],
                           textual_support: bool, numerical_support: bool,
                           temporal_support: bool, p_idx: int,
                           rdf_type_idx: int, root_var: ObjectTypeVariable,
-                          class_members_idx: np.ndarray) -> set[GraphPattern]:
-    """ Compute all root patterns with this predicate.
+                          s_idx_list: np.ndarray,
+                          o_idx_list: np.ndarray) -> set[GraphPattern]:
+    """ Compute all root patterns with this predicate. Reads the graph
+        from the worker's global state.
 
     :param rng:
     :type rng: np.random.Generator
-    :param kg:
-    :type kg: KnowledgeGraph
     :param min_support:
     :type min_support: float
     :param mode:
@@ -443,10 +621,14 @@ def compute_root_patterns(rng: np.random.Generator, kg: KnowledgeGraph,
     :type rdf_type_idx: int
     :param root_var:
     :type root_var: ObjectTypeVariable
-    :param class_members_idx:
-    :type class_members_idx: np.ndarray
+    :param s_idx_list: global indices of class members with this predicate
+    :type s_idx_list: np.ndarray
+    :param o_idx_list: global indices of the matching tail nodes
+    :type o_idx_list: np.ndarray
     :rtype: set[GraphPattern]
     """
+    kg = _kg
+
     # don't generate what we won't need
     generate_Abox = False
     generate_Tbox = False
@@ -461,14 +643,6 @@ def compute_root_patterns(rng: np.random.Generator, kg: KnowledgeGraph,
 
     root_patterns = set()
 
-    # mask for class members that have this relation outgoing
-    p_mask = np.isin(kg.A[p_idx].row, class_members_idx)
-
-    # list of global indices for class members with this property
-    # plus the matching tail nodes
-    s_idx_list = kg.A[p_idx].row[p_mask]
-    o_idx_list = kg.A[p_idx].col[p_mask]
-
     # infer (data) type from single tail node (assume rest is same)
     o_type, is_literal = infer_type(kg, rdf_type_idx, o_idx_list[-1])
 
@@ -479,9 +653,7 @@ def compute_root_patterns(rng: np.random.Generator, kg: KnowledgeGraph,
     # optimization by approximation.
     pattern = None
     o_idx = o_idx_list[0]
-    inv_assertion_map = {o_idx: {s_idx_list[i]
-                                 for i, idx in enumerate(o_idx_list)
-                                 if idx == o_idx} for o_idx in o_idx_list}
+    inv_assertion_map = group_by(o_idx_list, s_idx_list)
     if generate_Tbox and o_idx in kg.ni2ai.keys():
         # object is literal
         o_type = kg.i2a[kg.ni2ai[o_idx]]
@@ -508,27 +680,30 @@ def compute_root_patterns(rng: np.random.Generator, kg: KnowledgeGraph,
     # create graph_patterns for all predicate-object pairs
     # treat both entities and literals as node
     if generate_Abox:
-        if multimodal and is_literal:
-            o_freqs = Counter([kg.i2n[i].value for i in o_idx_list])
-            o_value_idx_map = {v: {i for i, o_idx in enumerate(o_idx_list)
-                                   if kg.i2n[o_idx].value == v}
-                               for v in o_freqs.keys()}
+        by_value = multimodal and is_literal
+        if by_value:
+            o_keys = _kg_values[o_idx_list]
         else:  # is IRI
-            o_freqs = Counter(o_idx_list)
-            o_value_idx_map = {kg.i2n[k]:
-                               {i for i, o_idx in enumerate(o_idx_list)
-                                if k == o_idx} for k in o_freqs.keys()}
+            o_keys = o_idx_list
 
-        for o_value, o_freq in o_freqs.items():
-            if o_freq < min_support:
-                continue
+        o_uniques, o_inverse, o_freqs = np.unique(o_keys,
+                                                  return_inverse=True,
+                                                  return_counts=True)
+
+        # group the head and tail nodes per unique value
+        order = np.argsort(o_inverse.ravel(), kind='stable')
+        boundaries = np.cumsum(o_freqs)[:-1]
+        s_groups = np.split(s_idx_list[order], boundaries)
+        o_groups = np.split(o_idx_list[order], boundaries)
 
-            if not is_literal:
+        for v_i in np.flatnonzero(o_freqs >= min_support):
+            o_value = o_uniques[v_i]
+            if not by_value:
                 o_value = kg.i2n[o_value]
 
-            domain = {s_idx_list[i] for i in o_value_idx_map[o_value]}
-            inv_assertion_map = {o_idx_list[i]: domain
-                                 for i in o_value_idx_map[o_value]}
+            domain = set(s_groups[v_i].tolist())
+            inv_assertion_map = {o_idx: domain
+                                 for o_idx in o_groups[v_i].tolist()}
 
             # create new graph_pattern
             pattern = new_graph_pattern(root_var, p, o_value,
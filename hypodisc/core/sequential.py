@@ -1,8 +1,7 @@
 #! /usr/bin/env python
 
-from collections import Counter
+from collections import Counter, deque
 from random import random
-from multiprocessing import Manager
 from typing import Literal, Optional, Union
 
 import numpy as np
@@ -13,7 +12,7 @@ from rdf.namespaces import RDF, RDFS
 from rdf.terms import IRIRef
 from rdf.terms import Literal as rdfLiteral
 
-from hypodisc.core.utils import predict_hash
+from hypodisc.core.utils import filter_visited, predict_hash
 from hypodisc.data.graph import KnowledgeGraph
 from hypodisc.core.structures import (Assertion, GraphPattern,
                                       ResourceWrapper,
@@ -134,10 +133,9 @@ def generate_df(root_patterns: dict[str, list],
                     if isinstance(pattern.assertion.rhs, ObjectTypeVariable):
                         derivatives.add(pattern)
                 else:
-                    endpoints = {a.rhs for a in pattern.distances[depth-1]
-                                 if isinstance(a.rhs, ObjectTypeVariable)}
+                    endpoints = pattern.endpoints[depth-1]
 
-                candidates = set()
+                candidates = dict()
                 for endpoint in endpoints:
                     if endpoint.value not in root_patterns.keys():
                         # no extension available
@@ -164,25 +162,30 @@ def generate_df(root_patterns: dict[str, list],
                         pattern_hash = predict_hash(pattern,
                                                     endpoint,
                                                     extension)
-                        if pattern_hash in visited:
+                        if pattern_hash in candidates.keys():
                             continue
-                        visited.add(pattern_hash)
 
-                        candidates.add((endpoint, extension))
+                        candidates[pattern_hash] = (endpoint, extension)
 
-                    extensions = explore(pattern,
-                                         candidates=candidates,
-                                         max_length=max_length,
-                                         max_width=max_width,
-                                         min_support=min_support)
+                if len(candidates) <= 0:
+                    continue
+
+                extensions = explore(pattern,
+                                     candidates=set(candidates.values()),
+                                     max_length=max_length,
+                                     max_width=max_width,
+                                     min_support=min_support)
 
-                    if out_writer is not None and out_prefix_map is not None:
-                        for pattern in extensions:
-                            num_patterns = write_query(out_writer, pattern,
-                                                       num_patterns, out_ns,
-                                                       out_prefix_map)
+                # omit patterns already discovered from another parent
+                extensions = filter_visited(extensions, visited)
 
-                    derivatives |= extensions
+                if out_writer is not None and out_prefix_map is not None:
+                    for derivative in extensions:
+                        num_patterns = write_query(out_writer, derivative,
+                                                   num_patterns, out_ns,
+                                                   out_prefix_map)
+
+                derivatives |= extensions
 
             print("(+{} discovered)".format(len(derivatives)))
 
@@ -253,10 +256,9 @@ def generate_bf(root_patterns: dict[str, list],
                     if isinstance(pattern.assertion.rhs, ObjectTypeVariable):
                         derivatives[name].add(pattern)
                 else:
-                    endpoints = {a.rhs for a in pattern.distances[depth-1]
-                                 if isinstance(a.rhs, ObjectTypeVariable)}
+                    endpoints = pattern.endpoints[depth-1]
 
-                candidates = set()
+                candidates = dict()
                 for endpoint in endpoints:
                     if endpoint.value not in root_patterns.keys():
                         # no extension available
@@ -283,25 +285,30 @@ def generate_bf(root_patterns: dict[str, list],
                         pattern_hash = predict_hash(pattern,
                                                     endpoint,
                                                     extension)
-                        if pattern_hash in visited:
+                        if pattern_hash in candidates.keys():
                             continue
-                        visited.add(pattern_hash)
 
-                        candidates.add((endpoint, extension))
+                        candidates[pattern_hash] = (endpoint, extension)
+
+                if len(candidates) <= 0:
+                    continue
+
+                extensions = explore(pattern,
+                                     candidates=set(candidates.values()),
+                                     max_length=max_length,
+                                     max_width=max_width,
+                                     min_support=min_support)
 
-                    extensions = explore(pattern,
-                                         candidates=candidates,
-                                         max_length=max_length,
-                                         max_width=max_width,
-                                         min_support=min_support)
+                # omit patterns already discovered from another parent
+                extensions = filter_visited(extensions, visited)
 
-                    if out_writer is not None and out_prefix_map is not None:
-                        for pattern in extensions:
-                            num_patterns = write_query(out_writer, pattern,
-                                                       num_patterns, out_ns,
-                                                       out_prefix_map)
+                if out_writer is not None and out_prefix_map is not None:
+                    for derivative in extensions:
+                        num_patterns = write_query(out_writer, derivative,
+                                                   num_patterns, out_ns,
+                                                   out_prefix_map)
 
-                    derivatives[name] |= extensions
+                derivatives[name] |= extensions
 
             print("(+{} discovered)".format(len(derivatives[name])))
 
@@ -331,42 +338,40 @@ def explore(parent: GraphPattern, candidates: set,
     """
     derivatives = set()  # valid patterns
     skipped = set()  # invalid patterns
-    with Manager() as manager:
-        qexplore = manager.Queue()
-        qexplore.put(parent)
+    qexplore = deque([parent])
 
-        while not qexplore.empty():
-            pattern = qexplore.get()
+    while len(qexplore) > 0:
+        pattern = qexplore.popleft()
 
-            if len(pattern) >= max_length or pattern.width() >= max_width:
-                continue
+        if len(pattern) >= max_length or pattern.width() >= max_width:
+            continue
 
-            for endpoint, extension in candidates:
-                pattern_hash = predict_hash(pattern, endpoint, extension)
-                if extension in pattern:
-                    # extension is already part of pattern
-                    continue
-                elif pattern_hash in derivatives:
-                    # already seen and added this pattern
-                    continue
-                elif pattern_hash in skipped:
-                    # already seen but skipped this pattern
-                    continue
+        for endpoint, extension in candidates:
+            pattern_hash = predict_hash(pattern, endpoint, extension)
+            if extension in pattern:
+                # extension is already part of pattern
+                continue
+            elif pattern_hash in derivatives:
+                # already seen and added this pattern
+                continue
+            elif pattern_hash in skipped:
+                # already seen but skipped this pattern
+                continue
 
-                pattern_new = extend(pattern, endpoint, extension)
-
-                # add as new if satisfies support and has a more constraint
-                # domain than its parent or when the extension allows for
-                # possible future extensions.
-                if pattern_new.support >= min_support\
-                        and (isinstance(extension.rhs, ObjectTypeVariable)
-                             or pattern_new.parent is None
-                             or pattern_new.support <
-                             pattern_new.parent.support):
-                    qexplore.put(pattern_new)  # explore further extensions
-                    derivatives.add(pattern_new)
-                else:
-                    skipped.add(pattern_hash)
+            pattern_new = extend(pattern, endpoint, extension)
+
+            # add as new if satisfies support and has a more constraint
+            # domain than its parent or when the extension allows for
+            # possible future extensions.
+            if pattern_new.support >= min_support\
+                    and (isinstance(extension.rhs, ObjectTypeVariable)
+                         or pattern_new.parent is None
+                         or pattern_new.support <
+                         pattern_new.parent.support):
+                qexplore.append(pattern_new)  # explore further extensions
+                derivatives.add(pattern_new)
+            else:
+                skipped.add(pattern_hash)
 
     return derivatives
 
@@ -1,6 +1,7 @@
 #! /usr/bin/env python
 
 from __future__ import annotations
+from hashlib import blake2b
 from typing import Dict, Iterator, List, Optional, Set, Union
 from uuid import uuid4
 
@@ -9,6 +10,29 @@ from rdf.terms import IRIRef, Resource
 from hypodisc.data.graph import ns2pf
 
 
+def node_hash(label:str, child_hashes:list[int]) -> int:
+    """ Return a 64-bit hash of a node in a rooted tree from its label and
+    the hashes of its children, which are sorted such that the result does
+    not depend on the order of the children. Unlike hash(), the result
+    does not differ between processes.
+
+    :param label:
+    :type label: str
+    :param child_hashes:
+    :type child_hashes: list[int]
+    :rtype: int
+    """
+    label_bytes = label.encode()
+
+    h = blake2b(digest_size=8)
+    h.update(len(label_bytes).to_bytes(8, 'little'))
+    h.update(label_bytes)
+    for child_hash in sorted(child_hashes):
+        h.update(child_hash.to_bytes(8, 'little'))
+
+    return int.from_bytes(h.digest(), 'little')
+
+
 class GraphPattern():
     """ GraphPattern class
 
@@ -32,11 +56,28 @@ class GraphPattern():
 
         self.connections = dict()  # type: Dict[Assertion, set]
         self.distances = dict()  # type: Dict[int, set]
+        self.endpoints = dict()  # type: Dict[int, set]
+
+        # memoized lookups; cleared whenever the pattern changes
+        self._cache = dict()  # type: Dict
+
+        # canonical hash of the pattern as rooted tree, and that of the
+        # subtree below each assertion; updated along the path to the root
+        # on extension
+        self._hash_state = 0
+        self._subtree_hashes = dict()  # type: Dict[Assertion, int]
+
+        # assertion which ends in each variable
+        self._incoming = dict()  # type: Dict[Variable, Assertion]
 
         if len(assertions) > 0:
             self.root = self._infer_root(assertions)
             self.distances = self._compute_distances({self.root}, assertions)
             self.connections = self._compute_connections(self.distances)
+            self.endpoints = self._compute_endpoints(self.distances)
+            self._incoming = {a.rhs: a for a in self.connections.keys()
+                              if isinstance(a.rhs, ObjectTypeVariable)}
+            self._compute_hashes()
 
             if len(assertions) == 1:
                 self.assertion = list(self.distances[0])[0]
@@ -113,6 +154,87 @@ class GraphPattern():
 
         return connections
 
+    def _compute_endpoints(self, distances:dict[int, set[Assertion]])\
+            -> dict[int, set[ObjectTypeVariable]]:
+        """ Compute the object type variables at each distance from the
+        root, which are the only places to connect new assertions to.
+
+        :param distances:
+        :type distances: dict[int, set[Assertion]]
+        :rtype: dict[int, set[ObjectTypeVariable]]
+        """
+        endpoints = {d: set() for d in distances.keys()}
+        for d, a_set in distances.items():
+            for a in a_set:
+                if isinstance(a.rhs, ObjectTypeVariable):
+                    endpoints[d].add(a.rhs)
+
+        return endpoints
+
+    def _compute_hashes(self) -> None:
+        """ Compute the hash of the subtree below each assertion, bottom
+        up, and that of the entire pattern.
+
+        :rtype: None
+        """
+        self._subtree_hashes = dict()
+        for d in sorted(self.distances.keys(), reverse=True):
+            for a in self.distances[d]:
+                self._subtree_hashes[a] = node_hash(
+                        self._label(a),
+                        [self._subtree_hashes[c]
+                         for c in self.connections[a]])
+
+        self._hash_state = node_hash(str(self.root),
+                                     [self._subtree_hashes[a]
+                                      for a in self.distances[0]])
+
+    @staticmethod
+    def _label(assertion:Assertion) -> str:
+        """ Return the label of an assertion in the canonical form, which
+        omits the identity of the variables.
+
+        :param assertion:
+        :type assertion: Assertion
+        :rtype: str
+        """
+        return f"{assertion.predicate} {assertion.rhs}"
+
+    def _rehash(self, endpoint:Variable, child_hash:int)\
+            -> tuple[list[tuple[Assertion, int]], int]:
+        """ Return the new hashes of the assertions on the path from the
+        endpoint to the root, and that of the entire pattern, as if a
+        subtree with this hash were connected to the endpoint. Does not
+        change the pattern.
+
+        :param endpoint:
+        :type endpoint: Variable
+        :param child_hash:
+        :type child_hash: int
+        :rtype: tuple[list[tuple[Assertion, int]], int]
+        """
+        child = None
+
+        path = list()
+        var = endpoint
+        while var != self.root:
+            a = self._incoming[var]
+            child_hashes = [self._subtree_hashes[c]
+                            for c in self.connections[a] if c is not child]
+            child_hashes.append(child_hash)
+
+            child = a
+            child_hash = node_hash(self._label(a), child_hashes)
+            path.append((a, child_hash))
+
+            var = a.lhs
+
+        child_hashes = [self._subtree_hashes[a]
+                        for a in self.distances[0] if a is not child]
+        child_hashes.append(child_hash)
+
+        return path, node_hash(str(self.root), child_hashes)
+
     def _update_domain(self, assertion:Optional[Assertion] = None) -> set:
         domains = list()  # type: list[set[int]]
         if assertion is None:
@@ -178,17 +300,32 @@ class GraphPattern():
                                   extension.rhs)
             extension._inv_idx_map = inv_idx_map
 
-            self.connections[assertion].add(extension)
             for d, assertions in self.distances.items():
                 if assertion in assertions:
                     distance = d + 1
 
                     break
 
+        if extension not in self.connections.keys():
+            # update the hashes from the extension up to the root
+            extension_hash = node_hash(self._label(extension), [])
+            path, self._hash_state = self._rehash(endpoint, extension_hash)
+            self._subtree_hashes[extension] = extension_hash
+            self._subtree_hashes.update(path)
+
+        if endpoint != self.root:
+            self.connections[assertion].add(extension)
+
         self.connections[extension] = set()
         if distance not in self.distances.keys():
             self.distances[distance] = set()
+            self.endpoints[distance] = set()
         self.distances[distance].add(extension)
+        if isinstance(extension.rhs, ObjectTypeVariable):
+            self.endpoints[distance].add(extension.rhs)
+            self._incoming[extension.rhs] = extension
+
+        self._cache = dict()
 
     def copy(self) -> GraphPattern:
         """ Create a deep copy, except for the assertions, which remain
@@ -202,11 +339,16 @@ class GraphPattern():
         g.assertion = self.assertion
         g.domain = {e for e in self.domain}
         g.support = self.support
+        g._hash_state = self._hash_state
+        g._subtree_hashes = {k: v for k, v in self._subtree_hashes.items()}
+        g._incoming = {k: v for k, v in self._incoming.items()}
 
         g.connections = {k: {v for v in self.connections[k]}
                          for k in self.connections.keys()}
         g.distances = {k: {v for v in self.distances[k]}
                        for k in self.distances.keys()}
+        g.endpoints = {k: {v for v in self.endpoints[k]}
+                       for k in self.endpoints.keys()}
 
         return g
 
@@ -236,12 +378,78 @@ class GraphPattern():
         return False
 
     def contains_at_depth(self, assertion:Assertion, depth:int) -> bool:
+        key = ('contains_at_depth', depth, assertion)
+        if key in self._cache.keys():
+            return self._cache[key]
+
+        contains = False
         if depth in self.distances.keys():
             for a in self.distances[depth]:
                 if a.equiv(assertion):
-                    return True
+                    contains = True
 
-        return False
+                    break
+
+        self._cache[key] = contains
+
+        return contains
+
+    def sorted_connections(self) -> tuple[list[Assertion], list[str]]:
+        """ Return the assertions in sorted order, together with their
+        string representations.
+
+        :rtype: tuple[list[Assertion], list[str]]
+        """
+        key = 'sorted_connections'
+        if key not in self._cache.keys():
+            assertions = sorted(self.connections.keys())
+            self._cache[key] = (assertions, [str(a) for a in assertions])
+
+        return self._cache[key]
+
+    def canonical_hash(self) -> int:
+        """ Return a hash which is identical for all patterns that form the
+        same rooted tree, regardless of the identity of their variables or
+        the order in which their assertions were added. Equals the hash
+        predicted by `hash_with` for its parent.
+
+        :rtype: int
+        """
+        return self._hash_state
+
+    def hash_with(self, endpoint:Variable, extension:Assertion) -> int:
+        """ Return the canonical hash of this pattern as if the extension
+        were connected to the endpoint, without creating that pattern. Only
+        recomputes the hashes on the path from the endpoint to the root.
+
+        :param endpoint:
+        :type endpoint: Variable
+        :param extension:
+        :type extension: Assertion
+        :rtype: int
+        """
+        assertion = Assertion(endpoint, extension.predicate, extension.rhs)
+        if assertion in self.connections.keys():
+            return self._hash_state
+
+        _, pattern_hash = self._rehash(endpoint,
+                                       node_hash(self._label(assertion), []))
+
+        return pattern_hash
+
+    def endpoint_hash(self, endpoint:Variable) -> int:
+        """ Return a hash of the position of the endpoint in this pattern,
+        which is identical for endpoints that cannot be told apart, and
+        which does not differ between runs. Computed as the canonical hash
+        of this pattern with the endpoint marked by an unlabelled leaf.
+
+        :param endpoint:
+        :type endpoint: Variable
+        :rtype: int
+        """
+        _, pattern_hash = self._rehash(endpoint, node_hash('', []))
+
+        return pattern_hash
 
     def depth(self) -> int:
         """ Return the length of the longest non-cyclic path
@@ -621,12 +829,23 @@ class GraphPattern():
 
         :rtype: str
         """
-        return "{" + "; ".join([str(assertion) for assertion in
-                                sorted(self.connections.keys())]) + "}"
+        _, labels = self.sorted_connections()
+
+        return "{" + "; ".join(labels) + "}"
 
     def __hash__(self) -> int:
         return hash(str(self))
 
+    def __getstate__(self) -> dict:
+        """ Omit memoized lookups when pickling
+
+        :rtype: dict
+        """
+        state = self.__dict__.copy()
+        state['_cache'] = dict()
+
+        return state
+
 
 class ResourceWrapper(IRIRef):
     """ Resource Wrapper class
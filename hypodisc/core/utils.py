@@ -25,15 +25,41 @@ from hypodisc.core.structures import Assertion, GraphPattern, Variable
 
 def predict_hash(pattern:GraphPattern, endpoint:Variable,
                  extension:Assertion) -> int:
-    connections = {Assertion(endpoint,
-                             extension.predicate,
-                             extension.rhs)}
-    connections.update(pattern.connections.keys())
-
-    return hash("{"
-                + "; ".join([str(assertion)
-                             for assertion in sorted(connections)])
-                + "}")
+    """ Return the hash of the canonical form of the pattern that would
+        result from connecting the extension to the endpoint, without
+        creating that pattern.
+
+    :param pattern:
+    :type pattern: GraphPattern
+    :param endpoint:
+    :type endpoint: Variable
+    :param extension:
+    :type extension: Assertion
+    :rtype: int
+    """
+    return pattern.hash_with(endpoint, extension)
+
+def filter_visited(patterns:set[GraphPattern],
+                   visited:set[int]) -> set[GraphPattern]:
+    """ Return the patterns which have not been visited yet, and mark
+        these as visited.
+
+    :param patterns:
+    :type patterns: set[GraphPattern]
+    :param visited:
+    :type visited: set[int]
+    :rtype: set[GraphPattern]
+    """
+    unvisited = set()
+    for pattern in patterns:
+        pattern_hash = pattern.canonical_hash()
+        if pattern_hash in visited:
+            continue
+
+        unvisited.add(pattern)
+        visited.add(pattern_hash)
+
+    return unvisited
 
 def floatProbabilityArg(arg:str) -> float:
     """ Custom argument type for probability
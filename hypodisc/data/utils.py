@@ -44,6 +44,15 @@ def write_query(f_out:NTriples, pattern:GraphPattern, num_patterns:int,
 
     return num_patterns
 
+def write_queries(f_out:NTriples, patterns:list[GraphPattern],
+                  num_patterns:int, base:IRIRef,
+                  prefix_map:dict[str, str]) -> int:
+    for pattern in patterns:
+        num_patterns = write_query(f_out, pattern, num_patterns,
+                                   base, prefix_map)
+
+    return num_patterns
+
 def mkfile(directory:str, basename:str, extension:str) -> Path:
     """ Return path to a new file. Adds numerical suffix if
         the file already exists.